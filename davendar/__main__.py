@@ -7,6 +7,11 @@ from aiohttp import web
 import aiohttp_jinja2
 from jinja2 import PackageLoader
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from .collection import Collection
 from .routes import router
 from .utils import FILTERS, GLOBALS
@@ -20,6 +25,11 @@ async def _init_collection(app: web.Application):
     app["collection:watch"] = create_task(app["collection"].watch())
 
 
+async def _close_collection(app: web.Application):
+    LOG.info("Closing collection")
+    app["collection"].close()
+
+
 def main(port: int, root: Path):
     app = web.Application()
     coll = Collection(root)
@@ -29,8 +39,10 @@ def main(port: int, root: Path):
     env.globals.update(GLOBALS)
     app.add_routes(router)
     app.on_startup.append(_init_collection)
+    app.on_cleanup.append(_close_collection)
     LOG.debug("Starting web server (port: %d)", port)
-    web.run_app(app, port=port)
+    loop = uvloop.new_event_loop() if uvloop else None
+    web.run_app(app, port=port, loop=loop)
 
 
 if __name__ == "__main__":
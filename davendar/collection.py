@@ -1,16 +1,30 @@
 from abc import ABC
-from asyncio.events import get_event_loop
+from asyncio import gather, get_running_loop, sleep
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from datetime import date, datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
 from enum import IntEnum
-import json
+from functools import lru_cache
+from heapq import merge
 import logging
+from multiprocessing import get_context
+from operator import attrgetter
+import os
 from pathlib import Path
 from recurring_ical_events import of as recurrences_of
-from typing import cast, Dict, Generic, Iterable, List, Optional, Type, TypeVar, Union
+from shutil import copymode
+from threading import Lock
+from typing import (Any, Callable, cast, Dict, Generic, Iterable, List, Optional, Tuple, Type,
+                    TypeVar, Union)
 from uuid import uuid4
 
-from asyncinotify import Inotify, Mask, Watch
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from asyncinotify import Event as InotifyEvent, Inotify, Mask, Watch
 from icalendar.cal import Component, Calendar as vCalendar, Event as vEvent, Todo as vTodo
 from icalendar.prop import vDDDTypes, vText
 
@@ -23,6 +37,31 @@ T2 = TypeVar("T2")
 
 LOG = logging.getLogger(__name__)
 
+_ICS_SUFFIX = ".ics"
+
+_RECURRENCE_LOCK = Lock()
+
+
+@lru_cache(maxsize=64)
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    # Views ask for the times of every entry on the same few days.
+    lower = datetime(day.year, day.month, day.day).astimezone()
+    return lower, lower + timedelta(days=1)
+
+
+def _read(path: Union[str, Path]) -> Tuple[bytes, Tuple[int, int, int]]:
+    # Files are read whole, so skip the buffering layer and read straight from the descriptor.
+    # Also stamp the contents with the file's modification time, size and inode, to detect
+    # changes (including a same-sized replacement within the timestamp's granularity).
+    with open(path, "rb", buffering=0) as raw:
+        stat = os.fstat(raw.fileno())
+        return raw.readall(), (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _parse(path: Union[str, Path]) -> Tuple[bytes, Tuple[int, int, int], Component]:
+    data, stamp = _read(path)
+    return data, stamp, Component.from_ical(data)
+
 
 class Entry(ABC):
 
@@ -30,16 +69,29 @@ class Entry(ABC):
         pass
 
     class Property(Generic[T]):
+        __slots__ = ("_field",)
         def __init__(self, field: str):
             self._field = field
         def __get__(self, instance: "Entry", _: Type["Entry"]) -> T:
-            node = instance._core[self._field]
+            cache = instance._cache
+            try:
+                return cache[self._field]
+            except KeyError:
+                pass
+            core = instance._core
+            node = core[self._field]
             if isinstance(node, vText):
-                return cast(T, str(node))
+                value = cast(T, str(node))
+            elif isinstance(node, vDDDTypes):
+                # Already holds the native value, so skip looking the field up again to decode.
+                value = cast(T, node.dt)
             else:
-                return instance._core.decoded(self._field)
+                value = core.decoded(self._field)
+            cache[self._field] = value
+            return value
 
     class _DefaultProperty(Property[T], Generic[T, T2]):
+        __slots__ = ("_default",)
         def __init__(self, field: str, default: T2):
             super().__init__(field)
             self._default = default
@@ -50,12 +102,23 @@ class Entry(ABC):
                 return self._default
 
     class DefaultProperty(_DefaultProperty[T, T]):
-        pass
+        __slots__ = ()
+        def __set__(self, instance: "Entry", value: T):
+            instance._changed()
+            instance._core.pop(self._field, None)
+            if value and value != self._default:
+                instance._core.add(self._field, value, encode=True)
 
     class MutableProperty(_DefaultProperty[T, None]):
+        __slots__ = ()
         def __init__(self, field: str):
             super().__init__(field, None)
         def __set__(self, instance: "Entry", value: Optional[T]):
+            if value and isinstance(value, str):
+                # Text replaces any existing value outright, no need to remove it first.
+                instance._changed()
+                instance._core[self._field] = vText(value)
+                return
             self.__del__(instance)
             if isinstance(value, datetime):
                 ddd = vDDDTypes(as_datetime(value))
@@ -65,11 +128,29 @@ class Entry(ABC):
             elif value:
                 instance._core.add(self._field, value, encode=True)
         def __del__(self, instance: "Entry"):
+            instance._changed()
             try:
                 del instance._core[self._field]
             except KeyError:
                 pass
 
+    class Coerced(Generic[T]):
+        __slots__ = ("_field", "_coerce", "_name")
+        def __init__(self, field: str, coerce: Callable[[Optional[DateMaybeTime]], Optional[T]]):
+            self._field = field
+            self._coerce = coerce
+        def __set_name__(self, _: Type["Entry"], name: str):
+            self._name = name
+        def __get__(self, instance: "Entry", _: Type["Entry"]) -> Optional[T]:
+            cache = instance._cache
+            try:
+                return cache[self._name]
+            except KeyError:
+                value = cache[self._name] = self._coerce(getattr(instance, self._field))
+                return value
+
+    RECURRENCE_WINDOWS = 16
+
     _base: Type[Component]
     _types: Dict[str, Type["Entry"]] = {}
 
@@ -78,9 +159,15 @@ class Entry(ABC):
 
     @classmethod
     def load(cls, calendar: "Calendar", filename: str):
-        path = calendar.path / filename
-        with open(path, "rb") as raw:
-            component = Component.from_ical(raw.read())
+        data, stamp = _read(calendar.path / filename)
+        return cls.load_from_bytes(calendar, filename, data, stamp=stamp)
+
+    @classmethod
+    def load_from_bytes(cls, calendar: "Calendar", filename: str, data: bytes,
+                        component: Optional[Component] = None,
+                        stamp: Optional[Tuple[int, int, int]] = None):
+        if not component:
+            component = Component.from_ical(data)
         if component.name != "VCALENDAR":
             raise Entry.Invalid("Root component must be a VCALENDAR")
         for part in component.subcomponents:
@@ -89,7 +176,11 @@ class Entry(ABC):
             except KeyError:
                 continue
             else:
-                return base(calendar, filename)
+                entry = base(calendar, filename, component)
+                # Unmodified, the entry serialises back to the file it came from.
+                entry._cache["ical"] = data
+                entry._stamp = stamp
+                return entry
         else:
             raise Entry.Invalid("File does not contain any supported components")
 
@@ -101,12 +192,18 @@ class Entry(ABC):
                 grouped[day].append(entry)
         return grouped
 
-    __slots__ = ("_calendar", "_filename", "_component")
+    __slots__ = ("_calendar", "_filename", "_path", "_stamp", "_component", "_core_cached",
+                 "_cache", "_virtual")
 
     def __init__(self, calendar: Optional["Calendar"] = None, filename: Optional[str] = None,
                  component: Optional[Component] = None, virtual: bool = False):
         self._calendar = calendar
-        self._filename = filename or "{}.ics".format(uuid4())
+        self._filename = filename or "{}{}".format(uuid4(), _ICS_SUFFIX)
+        self._path = calendar.path / self._filename if calendar else None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._core_cached: Optional[Component] = None
+        self._cache: Dict[str, Any] = {}
+        self._virtual = virtual
         if component:
             self._component = component
         elif filename and self.path and self.path.exists():
@@ -114,15 +211,27 @@ class Entry(ABC):
         else:
             self._component = vCalendar()
             self._component["PRODID"] = __package__
-        self._virtual = virtual
 
     @property
     def _core(self) -> Component:
-        cores = self._component.walk(self._base.name)
-        if len(cores) == 1:
-            return cores[0]
-        else:
-            return next(core for core in cores if "RRULE" in core or "RDATE" in core)
+        if self._core_cached is None:
+            # Entries live directly under the VCALENDAR (or are the component themselves, for
+            # recurrences), so there's no need to walk the whole tree.
+            if isinstance(self._component, self._base):
+                cores = [self._component]
+            else:
+                cores = [part for part in self._component.subcomponents
+                         if isinstance(part, self._base)]
+            if len(cores) == 1:
+                self._core_cached = cores[0]
+            else:
+                self._core_cached = next(core for core in cores
+                                         if "RRULE" in core or "RDATE" in core)
+        return self._core_cached
+
+    @property
+    def recurring(self):
+        return "RRULE" in self._core or "RDATE" in self._core
 
     @property
     def calendar(self):
@@ -130,9 +239,18 @@ class Entry(ABC):
 
     @calendar.setter
     def calendar(self, calendar: "Calendar"):
-        if self._calendar and self.path and self.path.exists():
-            self.path.rename(calendar.path / self._filename)
+        path = calendar.path / self._filename if calendar else None
+        if self._path and path:
+            try:
+                os.rename(self._path, path)
+            except FileNotFoundError:
+                # Not saved yet, so nothing to move -- unless it's the target that's missing.
+                if self._path.exists():
+                    raise
         self._calendar = calendar
+        self._path = path
+        # Generated recurrences refer back to the calendar.
+        self._cache.pop("windows", None)
 
     @property
     def filename(self):
@@ -140,7 +258,7 @@ class Entry(ABC):
 
     @property
     def path(self):
-        return self._calendar.path / self._filename if self._calendar else None
+        return self._path
 
     uid = Property[str]("UID")
     product = MutableProperty[str]("PRODID")
@@ -152,36 +270,29 @@ class Entry(ABC):
     description = MutableProperty[str]("DESCRIPTION")
     location = MutableProperty[str]("LOCATION")
 
-    @property
-    def start_dt(self):
-        return as_datetime(self.start)
-
-    @property
-    def end_dt(self):
-        return as_datetime(self.end)
-
-    @property
-    def start_d(self):
-        return as_date(self.start)
-
-    @property
-    def end_d(self):
-        return as_date(self.end)
-
-    @property
-    def start_t(self):
-        return as_time(self.start)
-
-    @property
-    def end_t(self):
-        return as_time(self.end)
+    start_dt = Coerced[datetime]("start", as_datetime)
+    end_dt = Coerced[datetime]("end", as_datetime)
+    start_d = Coerced[date]("start", as_date)
+    end_d = Coerced[date]("end", as_date)
+    start_t = Coerced[time]("start", as_time)
+    end_t = Coerced[time]("end", as_time)
 
     @property
     def all_day(self):
-        return self.start == self.start_d
+        cache = self._cache
+        if "all_day" not in cache:
+            cache["all_day"] = self.start == self.start_d
+        return cache["all_day"]
 
     @property
-    def days(self):
+    def days(self) -> Tuple[date, ...]:
+        # Read for every day an entry is shown on, so only expand the span once.
+        cache = self._cache
+        if "days" not in cache:
+            cache["days"] = self._span()
+        return cache["days"]
+
+    def _span(self):
         start = end = None
         if self.start_d:
             start = self.start_d
@@ -191,15 +302,14 @@ class Entry(ABC):
             if self.end_t == midnight:
                 end -= timedelta(days=1)
         if start and end:
-            span = range(1, (end - start).days + 1)
-            return (start,) + tuple(start + timedelta(days=offset) for offset in span)
+            span = range(start.toordinal(), max(start, end).toordinal() + 1)
+            return tuple(map(date.fromordinal, span))
         else:
             return tuple(filter(None, (start, end)))
 
     def times(self, day: date):
         start = end = None
-        lower = datetime(day.year, day.month, day.day).astimezone()
-        upper = lower + timedelta(days=1)
+        lower, upper = _day_bounds(day)
         if self.start:
             if self.start_dt >= upper:
                 return None
@@ -213,25 +323,66 @@ class Entry(ABC):
         return (start, end)
 
     def recurrence(self, start: date, end: date):
+        if (self._base is vEvent and not (self.recurring or "EXDATE" in self._core)
+                and self.start_dt and self.end_dt):
+            # Nothing to expand, so skip building a recurrence query (which only yields events).
+            if self.start_dt < as_datetime(end) and self.end_dt > as_datetime(start):
+                return [self]
+            else:
+                return []
+        # Slices run on executor threads, which may expand the same entry at once.
+        with _RECURRENCE_LOCK:
+            cache = self._cache
+            # Views are revisited when paging back and forth, so remember recent windows' results.
+            windows: Dict[Tuple[date, date], List[Entry]] = cache.setdefault("windows", {})
+            try:
+                return windows[(start, end)]
+            except KeyError:
+                pass
+            try:
+                if "recurrences" not in cache:
+                    # Building the query sets up the rules, so keep it for later windows.
+                    cache["recurrences"] = recurrences_of(self._component)
+                components = cache["recurrences"].between(start, end)
+            except Exception:
+                LOG.warning("Failed to generate recurrences of %r", self, exc_info=True)
+                return []
+            if len(windows) >= self.RECURRENCE_WINDOWS:
+                windows.clear()
+            recurrences = windows[(start, end)] = [
+                self.__class__(calendar=self.calendar, component=component, virtual=True)
+                for component in components]
+        return recurrences
+
+    def _changed(self):
+        # Anything derived from the entry is now stale, including its calendar's indexes.
+        self._cache.clear()
+        if self._calendar and not self._virtual:
+            self._calendar._partition(self)
+
+    def unchanged(self) -> bool:
+        # Watchers also fire for metadata-only changes (e.g. touch, chmod), which needn't reparse.
+        if not (self.path and self._stamp):
+            return False
         try:
-            components = recurrences_of(self._component).between(start, end)
-        except Exception:
-            LOG.warning("Failed to generate recurrences of %r", self, exc_info=True)
-            return []
-        else:
-            return [self.__class__(calendar=self.calendar, component=component, virtual=True)
-                    for component in components]
+            stat = self.path.stat()
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino) == self._stamp
 
     def reload(self):
-        if not (self.path and self.path.exists()):
+        if not (self.path and self.path.exists()) or self.unchanged():
             return
-        with open(self.path, "rb") as raw:
-            component = Component.from_ical(raw.read())
+        data, stamp = _read(self.path)
+        component = Component.from_ical(data)
         if component.name != "VCALENDAR":
             raise Entry.Invalid("Root component must be a VCALENDAR")
         for part in component.subcomponents:
             if isinstance(part, self._base):
                 self._component = component
+                self._core_cached = None
+                self._changed()
+                self._stamp = stamp
                 break
         else:
             raise Entry.Invalid("File does not contain any supported components")
@@ -241,11 +392,36 @@ class Entry(ABC):
             raise ValueError("Entry is virtual")
         if not self.path:
             raise ValueError("Must assign event to a calendar before saving")
+        now = datetime.now(timezone.utc)
         if not self.created:
-            self.created = datetime.utcnow().astimezone(timezone.utc)
-        self.updated = datetime.utcnow().astimezone(timezone.utc)
-        with open(self.path, "wb") as raw:
-            raw.write(self._component.to_ical())
+            self.created = now
+        self.updated = now
+        # Write alongside and move into place, so watchers never see a partially written file
+        # (the temporary name doesn't end in .ics, so it's ignored until the rename).
+        temp = self.path.with_name(".{}.tmp".format(self._filename))
+        try:
+            with open(temp, "wb", buffering=0) as raw:
+                raw.write(self.to_ical())
+                stat = os.fstat(raw.fileno())
+            try:
+                # Keep the permissions of the file being replaced, rather than the umask's.
+                copymode(self.path, temp)
+            except FileNotFoundError:
+                pass
+            os.replace(temp, self.path)
+            # The entry already matches what was written, so the watcher needn't reparse it.
+            self._stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except BaseException:
+            if temp.exists():
+                temp.unlink()
+            raise
+
+    def to_ical(self) -> bytes:
+        # Serialising is as slow as parsing, so hold on to the output until the entry changes.
+        cache = self._cache
+        if "ical" not in cache:
+            cache["ical"] = self._component.to_ical()
+        return cache["ical"]
 
     def delete(self):
         if self._virtual:
@@ -255,8 +431,12 @@ class Entry(ABC):
 
     @property
     def _lt_tuple(self):
-        default = as_datetime(datetime.now())
-        return (self.start_dt or default, self.end_dt or default, self.summary)
+        start, end = self.start_dt, self.end_dt
+        if not (start and end):
+            # Undated entries sort as if they happen now.
+            default = as_datetime(datetime.now())
+            start, end = start or default, end or default
+        return (start, end, self.summary)
 
     def __lt__(self, other: "Entry"):
         return self._lt_tuple < other._lt_tuple
@@ -272,6 +452,8 @@ class Event(Entry):
 
     _base = vEvent
 
+    __slots__ = ()
+
     def __init__(self, calendar: Optional["Calendar"] = None, filename: Optional[str] = None,
                  component: Optional[Component] = None, virtual: bool = False):
         super().__init__(calendar, filename, component, virtual)
@@ -281,6 +463,7 @@ class Event(Entry):
             event = vEvent()
             event["UID"] = str(uuid4())
             self._component.add_component(event)
+            self._core_cached = event
 
     end = Entry.MutableProperty[DateMaybeTime]("DTEND")
 
@@ -294,6 +477,8 @@ class Task(Entry):
 
     _base = vTodo
 
+    __slots__ = ()
+
     def __init__(self, calendar: Optional["Calendar"] = None, filename: Optional[str] = None,
                  component: Optional[Component] = None, virtual: bool = False):
         super().__init__(calendar, filename, component, virtual)
@@ -303,6 +488,7 @@ class Task(Entry):
             task = vTodo()
             task["UID"] = str(uuid4())
             self._component.add_component(task)
+            self._core_cached = task
 
     end = Entry.MutableProperty[DateMaybeTime]("DUE")
     priority = Entry.DefaultProperty[int]("PRIORITY", 0)
@@ -325,14 +511,90 @@ class Task(Entry):
 
 class Calendar:
 
-    __slots__ = ("_collection", "_dirname", "_entries_by_uid", "_entries_by_filename",
-                 "label", "colour")
+    class Index:
+        """
+        Entries sorted by start time, split by whether they have a fixed end.  One-off entries
+        overlapping a window must start no earlier than the longest one-off entry's duration
+        before it, so can be found by bisecting on start; recurring entries are bounded only by
+        their first start.  Undated entries never fall within a window, so aren't indexed.
+        """
+
+        __slots__ = ("starts", "ends", "fixed", "span", "latest", "unbounded_starts", "unbounded")
+
+        def __init__(self, entries: Iterable[Entry]):
+            fixed: List[Entry] = []
+            unbounded: List[Entry] = []
+            for entry in entries:
+                if not entry.start_dt:
+                    continue
+                elif entry.end_dt and not entry.recurring:
+                    fixed.append(entry)
+                else:
+                    unbounded.append(entry)
+            self.fixed = sorted(fixed, key=attrgetter("start_dt"))
+            self.starts = [entry.start_dt for entry in self.fixed]
+            self.ends = [entry.end_dt for entry in self.fixed]
+            self.span = max((entry.end_dt - entry.start_dt for entry in fixed),
+                            default=timedelta(0))
+            self.latest = max(self.ends, default=None)
+            self.unbounded = sorted(unbounded, key=attrgetter("start_dt"))
+            self.unbounded_starts = [entry.start_dt for entry in self.unbounded]
+
+        def overlaps(self, not_before: datetime, not_after: datetime):
+            if self.unbounded_starts and self.unbounded_starts[0] < not_after:
+                return True
+            elif not self.latest or self.starts[0] >= not_after:
+                return False
+            else:
+                return self.latest > not_before
+
+        def candidates(self, not_before: datetime, not_after: datetime):
+            lower = bisect_right(self.starts, not_before - self.span)
+            upper = bisect_left(self.starts, not_after)
+            selected = [entry for entry, end in zip(self.fixed[lower:upper], self.ends[lower:upper])
+                        if end > not_before]
+            selected += self.unbounded[:bisect_left(self.unbounded_starts, not_after)]
+            return selected
+
+        def slice(self, not_before: datetime, not_after: datetime):
+            selected: List[Entry] = []
+            before_date = as_date(not_before)
+            after_date = as_date(not_after)
+            for entry in self.candidates(not_before, not_after):
+                if entry.all_day:
+                    start, end = before_date, after_date
+                else:
+                    start, end = not_before, not_after
+                recurring = entry.recurrence(start, end)
+                for recur in recurring:
+                    if not recur.start_dt or not recur.end_dt:
+                        continue
+                    elif recur.end_dt <= not_before:
+                        continue
+                    elif recur.start_dt >= not_after:
+                        continue
+                    else:
+                        selected.append(recur)
+            return sorted(selected)
+
+    METADATA = ".Radicale.props"
+
+    __slots__ = ("_collection", "_dirname", "_path", "_entries_by_uid", "_entries_by_filename",
+                 "_events_by_uid", "_tasks_by_uid", "_by_start", "_events", "_tasks",
+                 "_metadata_mtime", "label", "colour")
 
     def __init__(self, collection: "Collection", dirname: str):
         self._collection = collection
         self._dirname = dirname
+        self._path = collection.path / dirname
         self._entries_by_uid: Dict[str, Entry] = {}
         self._entries_by_filename: Dict[str, Entry] = {}
+        self._events_by_uid: Dict[str, Event] = {}
+        self._tasks_by_uid: Dict[str, Task] = {}
+        self._by_start: Optional[Calendar.Index] = None
+        self._events: Optional[Tuple[Event, ...]] = None
+        self._tasks: Optional[Tuple[Task, ...]] = None
+        self._metadata_mtime: Optional[int] = None
         self.label = self.colour = None
 
     def sync(self):
@@ -352,45 +614,59 @@ class Calendar:
 
     @property
     def path(self):
-        return self._collection.path / self._dirname
+        return self._path
 
     @property
     def entries(self):
-        return frozenset(self._entries_by_uid.values())
+        return self._entries_by_uid.values()
 
     @property
     def events(self):
-        return sorted(entry for entry in self.entries if isinstance(entry, Event))
+        if self._events is None:
+            self._events = tuple(sorted(self._events_by_uid.values()))
+        return self._events
 
     @property
     def tasks(self):
-        return sorted(entry for entry in self.entries if isinstance(entry, Task))
+        if self._tasks is None:
+            self._tasks = tuple(sorted(self._tasks_by_uid.values()))
+        return self._tasks
+
+    @property
+    def index(self):
+        # Rebuilt lazily after the entries change, as changes are rare compared to lookups.
+        if self._by_start is None:
+            self._by_start = self.Index(self.entries)
+        return self._by_start
+
+    def overlaps(self, not_before: datetime, not_after: datetime):
+        return self.index.overlaps(not_before, not_after)
 
     def slice(self, not_before: datetime, not_after: datetime):
-        selected: List[Entry] = []
-        before_date = as_date(not_before)
-        after_date = as_date(not_after)
-        for entry in self.entries:
-            if entry.all_day:
-                start, end = before_date, after_date
-            else:
-                start, end = not_before, not_after
-            recurring = entry.recurrence(start, end)
-            for recur in recurring:
-                if not recur.start_dt or not recur.end_dt:
-                    continue
-                elif recur.end_dt <= not_before:
-                    continue
-                elif recur.start_dt >= not_after:
-                    continue
-                else:
-                    selected.append(recur)
-        return sorted(selected)
+        return self.index.slice(not_before, not_after)
+
+    def _partition(self, entry: Entry):
+        # Only the sorted view for the entry's own type needs rebuilding.
+        self._by_start = None
+        if isinstance(entry, Event):
+            self._events = None
+            return self._events_by_uid
+        elif isinstance(entry, Task):
+            self._tasks = None
+            return self._tasks_by_uid
+        else:
+            return None
 
     def add_entry(self, entry: Entry):
         entry.calendar = self
+        replaced = self._entries_by_uid.get(entry.uid)
+        if replaced is not None and replaced is not entry:
+            self._drop_typed(replaced)
         self._entries_by_uid[entry.uid] = entry
         self._entries_by_filename[entry.filename] = entry
+        typed = self._partition(entry)
+        if typed is not None:
+            typed[entry.uid] = entry
 
     def move_entry(self, entry: Entry, target: "Calendar"):
         self.unload_entry(entry.filename)
@@ -399,15 +675,34 @@ class Calendar:
     def drop_entry(self, entry: Entry):
         del self._entries_by_filename[entry.filename]
         del self._entries_by_uid[entry.uid]
+        self._drop_typed(entry)
 
-    def load_entry(self, filename: str):
+    def _drop_typed(self, entry: Entry):
+        typed = self._partition(entry)
+        if typed is not None:
+            typed.pop(entry.uid, None)
+
+    def read_entry(self, filename: str, data: Optional[bytes] = None,
+                   component: Optional[Component] = None,
+                   stamp: Optional[Tuple[int, int, int]] = None) -> Optional[Entry]:
         try:
-            event = Entry.load(self, filename)
+            if data is None:
+                current = self._entries_by_filename.get(filename)
+                if current and current.unchanged():
+                    # Already loaded and up-to-date, nothing to add.
+                    return None
+                return Entry.load(self, filename)
+            else:
+                return Entry.load_from_bytes(self, filename, data, component, stamp)
         except Entry.Invalid as ex:
             path = self.path / filename
             LOG.warning("Skipping non-entry file: %s (%s)", path, ex.args[0])
-        else:
-            self.add_entry(event)
+            return None
+
+    def load_entry(self, filename: str):
+        entry = self.read_entry(filename)
+        if entry:
+            self.add_entry(entry)
 
     def unload_entry(self, filename: str):
         try:
@@ -419,24 +714,36 @@ class Calendar:
     def scan_entries(self):
         count = 0
         LOG.debug("Scanning calendar: %s", self.dirname)
-        for child in self.path.iterdir():
-            if child.name.endswith(".ics"):
-                self.load_entry(child.name)
+        with os.scandir(self.path) as children:
+            files = [(child.name, child.path) for child in children
+                     if child.name.endswith(_ICS_SUFFIX) and child.is_file()]
+        # Parsing is CPU-bound, so fan it out to other processes and build the entries here.
+        # The directory entries' own paths are plain strings, cheaper to send than new Paths.
+        parsed = self._collection.pool.map(_parse, (path for _, path in files), chunksize=16)
+        for (filename, _), (data, stamp, component) in zip(files, parsed):
+            entry = self.read_entry(filename, data, component, stamp)
+            if entry:
+                self.add_entry(entry)
                 count += 1
         LOG.debug("Added %d entries from %s", count, self.dirname)
 
     def scan_metadata(self):
-        radicale = self.path / ".Radicale.props"
-        if radicale.exists():
-            try:
-                with open(radicale) as props:
-                    meta = json.load(props)
-            except Exception:
-                pass
-            else:
-                self.label = meta.get("D:displayname")
-                self.colour = meta.get("ICAL:calendar-color")
-                LOG.debug("Identified calendar %r as %r", self.dirname, self.label)
+        radicale = self.path / self.METADATA
+        try:
+            mtime = radicale.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._metadata_mtime:
+            return
+        try:
+            meta = json_loads(radicale.read_bytes())
+        except Exception:
+            pass
+        else:
+            self._metadata_mtime = mtime
+            self.label = meta.get("D:displayname")
+            self.colour = meta.get("ICAL:calendar-color")
+            LOG.debug("Identified calendar %r as %r", self.dirname, self.label)
 
     def __getitem__(self, key: str):
         try:
@@ -444,6 +751,9 @@ class Calendar:
         except KeyError:
             return self._entries_by_filename[key]
 
+    def __contains__(self, key: str):
+        return key in self._entries_by_uid or key in self._entries_by_filename
+
     @repr_factory
     def __repr__(self):
         return [repr(self.dirname), repr(self.label) if self.label else None]
@@ -451,13 +761,19 @@ class Calendar:
 
 class Collection:
 
-    MASK_CHANGE = Mask.CREATE | Mask.MODIFY | Mask.DELETE | Mask.MOVE
+    MASK_GROUP = Mask.CREATE | Mask.DELETE | Mask.MOVE
+    MASK_CALENDAR = Mask.CLOSE_WRITE | Mask.DELETE | Mask.MOVE
+    DEBOUNCE = 0.05
+    POLL_INTERVAL = 5
+    FS_REMOTE = frozenset(("nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p"))
 
-    __slots__ = ("_path", "_calendars")
+    __slots__ = ("_path", "_calendars", "_pool", "_pool_lock")
 
     def __init__(self, path: Path):
         self._path = path
         self._calendars: Dict[str, Calendar] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = Lock()
 
     @property
     def path(self):
@@ -465,10 +781,25 @@ class Collection:
 
     @property
     def calendars(self):
-        return frozenset(self._calendars.values())
+        return self._calendars.values()
+
+    @property
+    def pool(self):
+        # Started on first use, from a fresh server process rather than forking this one: by now
+        # it has running threads (which can leave held locks in the child) and open sockets.
+        with self._pool_lock:
+            if not self._pool:
+                self._pool = ProcessPoolExecutor(mp_context=get_context("forkserver"))
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool:
+                self._pool.shutdown()
+                self._pool = None
 
     async def open_calendar(self, name: str):
-        loop = get_event_loop()
+        loop = get_running_loop()
         calendar = Calendar(self, name)
         try:
             await loop.run_in_executor(None, calendar.sync)
@@ -483,63 +814,210 @@ class Collection:
         del self._calendars[calendar.dirname]
 
     def slice(self, not_before: datetime, not_after: datetime):
-        selected: List[Entry] = []
-        for calendar in self.calendars:
-            selected += calendar.slice(not_before, not_after)
-        return sorted(selected)
+        # Each calendar's slice is already sorted, so merge rather than sorting again.
+        return list(merge(*(calendar.slice(not_before, not_after) for calendar in self.calendars
+                            if calendar.overlaps(not_before, not_after))))
+
+    async def aslice(self, not_before: datetime, not_after: datetime):
+        loop = get_running_loop()
+        # Take each index here, so the workers don't race with changes made by the watcher.
+        indexes = [calendar.index for calendar in self.calendars
+                   if calendar.overlaps(not_before, not_after)]
+        slices = await gather(*(loop.run_in_executor(None, index.slice, not_before, not_after)
+                                for index in indexes))
+        return list(merge(*slices))
+
+    async def _batches(self, inotify: Inotify):
+        # Saving a file commonly produces a burst of events (e.g. truncate, write, rename), so
+        # collect everything arriving shortly after the first event and yield each name once,
+        # with the union of its masks.  Handlers act on the current state of the filesystem.
+        inotify.sync_timeout = 0
+        while True:
+            change: Optional[InotifyEvent] = await inotify.get()
+            await sleep(self.DEBOUNCE)
+            batch: Dict[Tuple[Watch, str], Mask] = {}
+            while change:
+                if change.watch and change.name:
+                    key = (change.watch, str(change.name))
+                    batch[key] = batch.get(key, Mask(0)) | change.mask
+                change = inotify.sync_get()
+            yield batch
+
+    @staticmethod
+    def _exists(path: Path, mask: Mask):
+        # Where a batch's events only go one way, they say whether the file is there without
+        # having to stat it.  A mix of writes and removals needs to check the filesystem.
+        written = mask & (Mask.CLOSE_WRITE | Mask.MOVED_TO)
+        removed = mask & (Mask.DELETE | Mask.MOVED_FROM)
+        if written and not removed:
+            return True
+        elif removed and not written:
+            return False
+        else:
+            return path.is_file()
+
+    def _remote(self):
+        # Changes made by other hosts to network filesystems never reach inotify, so find the
+        # type of the mount holding the root (the longest matching mount point).
+        parents = {self.path, *self.path.parents}
+        match: Optional[Path] = None
+        fstype = None
+        try:
+            with open("/proc/mounts") as mounts:
+                for line in mounts:
+                    _, point, kind = line.split()[:3]
+                    mount = Path(point.replace("\\040", " "))
+                    if mount in parents and (not match or len(mount.parts) > len(match.parts)):
+                        match, fstype = mount, kind
+        except OSError:
+            return False
+        return fstype in self.FS_REMOTE
+
+    def _snapshot(self):
+        snapshot: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+        with os.scandir(self.path) as children:
+            dirs = [child for child in children if child.is_dir()]
+        for child in dirs:
+            files = snapshot[child.name] = {}
+            with os.scandir(child.path) as items:
+                for item in items:
+                    if not (item.name.endswith(_ICS_SUFFIX) or item.name == Calendar.METADATA):
+                        continue
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    files[item.name] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return snapshot
+
+    async def _load_entries(self, pending: List[Tuple[Calendar, str]]):
+        # Read and parse off the event loop, all together, then index back on it.
+        loop = get_running_loop()
+        results = await gather(*(loop.run_in_executor(None, calendar.read_entry, name)
+                                 for calendar, name in pending), return_exceptions=True)
+        for (calendar, name), result in zip(pending, results):
+            if isinstance(result, Exception):
+                LOG.warning("Exception loading entry: %s", calendar.path / name, exc_info=result)
+            elif result:
+                calendar.add_entry(result)
 
     async def watch(self):
+        mode = os.getenv("DAVENDAR_WATCH")
+        if mode == "poll" or (mode != "inotify" and self._remote()):
+            await self._watch_poll()
+        else:
+            await self._watch_inotify()
+
+    async def _watch_poll(self):
+        loop = get_running_loop()
+        previous: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+        LOG.info("Polling for filesystem changes every %gs", self.POLL_INTERVAL)
+        while True:
+            try:
+                current = await loop.run_in_executor(None, self._snapshot)
+            except Exception:
+                LOG.warning("Failed to scan collection", exc_info=True)
+                await sleep(self.POLL_INTERVAL)
+                continue
+            try:
+                for name in previous.keys() - current.keys():
+                    # Calendar was deleted or moved out of the root.
+                    LOG.debug("Removing old calendar: %s", name)
+                    self.drop_calendar(self._calendars[name])
+                names = [name for name in current if name not in self._calendars]
+                for name in names:
+                    LOG.debug("Adding new calendar: %s", name)
+                for calendar in await gather(*(self.open_calendar(name) for name in names)):
+                    self.add_calendar(calendar)
+                pending: List[Tuple[Calendar, str]] = []
+                for name, files in current.items():
+                    if name in names:
+                        continue
+                    calendar = self._calendars[name]
+                    old = previous.get(name, {})
+                    for filename, stat in files.items():
+                        if old.get(filename) == stat:
+                            continue
+                        elif filename == Calendar.METADATA:
+                            LOG.debug("Updating calendar metadata: %s", name)
+                            await loop.run_in_executor(None, calendar.scan_metadata)
+                        else:
+                            LOG.debug("Adding new event: %s/%s", name, filename)
+                            pending.append((calendar, filename))
+                    for filename in old.keys() - files.keys() - {Calendar.METADATA}:
+                        LOG.debug("Removing old event: %s/%s", name, filename)
+                        calendar.unload_entry(filename)
+                await self._load_entries(pending)
+            except Exception:
+                LOG.warning("Exception handling polled changes", exc_info=True)
+            previous = current
+            await sleep(self.POLL_INTERVAL)
+
+    async def _watch_inotify(self):
         with Inotify() as inotify:
             watches: Dict[Path, Watch] = {}
             # Watch for new and removed calendar dirs in the root.
-            top = inotify.add_watch(self.path, self.MASK_CHANGE)
-            # Watch all current directories for new, changed and removed events.
-            for child in self.path.iterdir():
-                if child.is_dir():
-                    watches[child] = inotify.add_watch(child, self.MASK_CHANGE)
+            top = inotify.add_watch(self.path, self.MASK_GROUP)
+            # Watch all current directories for new, changed and removed events.  Written files
+            # are picked up once on close rather than for every individual write.
+            with os.scandir(self.path) as children:
+                for child in children:
+                    if child.is_dir():
+                        path = self.path / child.name
+                        watches[path] = inotify.add_watch(path, self.MASK_CALENDAR)
             LOG.info("Running initial directory scan")
-            for path in watches:
-                if path.parent == self.path and path.name not in self._calendars:
-                    calendar = await self.open_calendar(path.name)
-                    self.add_calendar(calendar)
+            names = [path.name for path in watches if path.name not in self._calendars]
+            for calendar in await gather(*(self.open_calendar(name) for name in names)):
+                self.add_calendar(calendar)
             LOG.info("Listening for filesystem changes")
-            async for change in inotify:
-                try:
-                    if not change.name or not change.watch:
-                        continue
-                    name = str(change.name)
-                    path = change.watch.path / change.name
-                    if change.watch is top:
-                        # Change relates to the group itself.
-                        watched = path in watches
-                        if not watched and path.is_dir():
-                            # Calendar was created or moved in to the group.
-                            LOG.debug("Adding new calendar: %s", path.name)
-                            watches[path] = inotify.add_watch(path, self.MASK_CHANGE)
-                            calendar = await self.open_calendar(name)
-                            self.add_calendar(calendar)
-                        elif watched and not path.is_dir():
-                            # Calendar was deleted or moved out of the root.
-                            LOG.debug("Removing old calendar: %s", path.name)
-                            # Can't remove the watch if the watched dir was deleted.
-                            if not change.mask & Mask.DELETE:
-                                inotify.rm_watch(watches.pop(path))
-                            calendar = self._calendars[name]
-                            self.drop_calendar(calendar)
-                    elif path.is_file():
-                        # Change relates to a new or updated calendar item.
-                        dirname = change.watch.path.name
-                        calendar = self._calendars[dirname]
-                        LOG.debug("Adding new event: %s/%s", dirname, path.name)
-                        calendar.load_entry(name)
-                    elif change.mask & Mask.DELETE:
-                        # Change relates to a deleted calendar item.
-                        dirname = change.watch.path.name
-                        calendar = self._calendars[dirname]
-                        LOG.debug("Removing old event: %s/%s", dirname, path.name)
-                        calendar.unload_entry(name)
-                except Exception:
-                    LOG.warning("Exception handling change: %r", change, exc_info=True)
+            async for batch in self._batches(inotify):
+                pending: List[Tuple[Calendar, str]] = []
+                for (watch, name), mask in batch.items():
+                    path = watch.path / name
+                    try:
+                        if watch is top:
+                            # Change relates to the group itself.
+                            watched = path in watches
+                            if not watched and path.is_dir():
+                                # Calendar was created or moved in to the group.
+                                LOG.debug("Adding new calendar: %s", path.name)
+                                watches[path] = inotify.add_watch(path, self.MASK_CALENDAR)
+                                calendar = await self.open_calendar(name)
+                                self.add_calendar(calendar)
+                            elif watched and not path.is_dir():
+                                # Calendar was deleted or moved out of the root.
+                                LOG.debug("Removing old calendar: %s", path.name)
+                                # Can't remove the watch if the watched dir was deleted.
+                                if not mask & Mask.DELETE:
+                                    inotify.rm_watch(watches.pop(path))
+                                calendar = self._calendars[name]
+                                self.drop_calendar(calendar)
+                        elif name == Calendar.METADATA:
+                            # Calendar was renamed or recoloured.
+                            calendar = self._calendars[watch.path.name]
+                            LOG.debug("Updating calendar metadata: %s", watch.path.name)
+                            await get_running_loop().run_in_executor(None, calendar.scan_metadata)
+                        elif not name.endswith(_ICS_SUFFIX):
+                            # Ignore non-entry files, e.g. metadata or editor temporaries.
+                            continue
+                        elif self._exists(path, mask):
+                            # Change relates to a new or updated calendar item.
+                            dirname = watch.path.name
+                            calendar = self._calendars[dirname]
+                            LOG.debug("Adding new event: %s/%s", dirname, path.name)
+                            pending.append((calendar, name))
+                        elif mask & (Mask.DELETE | Mask.MOVED_FROM):
+                            # Change relates to a deleted calendar item.
+                            dirname = watch.path.name
+                            calendar = self._calendars[dirname]
+                            if name not in calendar:
+                                # Created and removed again within the batch, never loaded.
+                                continue
+                            LOG.debug("Removing old event: %s/%s", dirname, path.name)
+                            calendar.unload_entry(name)
+                    except Exception:
+                        LOG.warning("Exception handling change: %s (%r)", path, mask, exc_info=True)
+                await self._load_entries(pending)
 
     def __getitem__(self, key: str):
         try:
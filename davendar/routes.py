@@ -1,3 +1,4 @@
+from asyncio import get_running_loop
 from calendar import Calendar
 from datetime import date, timedelta
 from functools import wraps
@@ -62,10 +63,10 @@ async def redirect(request: web.Request):
 async def create(request: web.Request, form: Mapping[str, str], coll: Collection):
     words = form["text"].split()
     name = None
-    for word in words:
+    for i, word in enumerate(words):
         if word.startswith("@"):
             name = word[1:].lower()
-            words.remove(word)
+            del words[i]
             break
     for cal in coll.calendars:
         if not name or (cal.label and name in cal.label.lower()):
@@ -73,7 +74,7 @@ async def create(request: web.Request, form: Mapping[str, str], coll: Collection
     else:
         raise web.HTTPBadRequest
     try:
-        title, start, end, location = text_parse(words)
+        title, start, end, location = text_parse(" ".join(words))
     except ValueError:
         LOG.debug("Failed to parse %r", form["text"], exc_info=True)
         raise web.HTTPBadRequest
@@ -83,7 +84,7 @@ async def create(request: web.Request, form: Mapping[str, str], coll: Collection
     event.end = end
     event.location = location
     LOG.info("Adding new event: %r", event)
-    event.save()
+    await get_running_loop().run_in_executor(None, event.save)
     target = start or end or date.today()
     try:
         route = request.app.router[form["route"]]
@@ -111,7 +112,7 @@ async def entry(request: web.Request, coll: Collection):
 async def entry_delete(request: web.Request, form: Mapping[str, str], coll: Collection):
     cal = coll[request.match_info["cal"]]
     entry = cal[request.match_info["entry"]]
-    entry.delete()
+    await get_running_loop().run_in_executor(None, entry.delete)
     today = date.today()
     return request.app.router["month"].url_for(year=str(today.year), month=str(today.month))
 
@@ -124,7 +125,7 @@ async def month(request: web.Request, coll: Collection):
     start = as_datetime(dates[0][0])
     end = as_datetime(dates[-1][-1] + timedelta(days=1))
     return {
-        "entries": Entry.group(coll.slice(start, end)),
+        "entries": Entry.group(await coll.aslice(start, end)),
         "weeks": dates,
         "selected": date(year, month, 1),
     }
@@ -138,7 +139,7 @@ async def week(request: web.Request, coll: Collection):
     start = as_datetime(week.day(0))
     end = start + timedelta(days=7)
     return {
-        "entries": Entry.group(coll.slice(start, end)),
+        "entries": Entry.group(await coll.aslice(start, end)),
         "selected": week,
         "prev": Week.withdate(start - timedelta(days=1)),
         "next": Week.withdate(end + timedelta(days=1)),
@@ -153,6 +154,6 @@ async def day(request: web.Request, coll: Collection):
     start = as_datetime(date(year, month, day))
     end = start + timedelta(days=1)
     return {
-        "entries": coll.slice(start, end),
+        "entries": await coll.aslice(start, end),
         "selected": start,
     }
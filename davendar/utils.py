@@ -1,6 +1,9 @@
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 import os
-from typing import Any, Callable, Dict, Iterable, List, Optional, overload, TypeVar, Union
+import re
+from typing import (Any, Callable, Dict, Iterable, List, Optional, overload, Tuple, TypeVar,
+                    Union)
 from urllib.parse import quote
 
 try:
@@ -13,6 +16,7 @@ import aiohttp_jinja2
 from dateparser.date import DateDataParser
 from dateutil.relativedelta import relativedelta
 from isoweek import Week
+from jinja2 import Environment
 
 
 T = TypeVar("T")
@@ -27,7 +31,23 @@ except KeyError:
     raise RuntimeError("TZ environment variable not set to a valid timezone")
 
 
-DATE_PARSER = DateDataParser(settings={"RETURN_TIME_AS_PERIOD": True})
+# Detecting the language of each input tries every locale dateparser knows, which dominates
+# the parse time, so limit it to the expected ones (English by default, like the keywords).
+DATE_LANGUAGES = [lang.strip() for lang in os.getenv("DAVENDAR_LANGUAGES", "en").split(",")
+                  if lang.strip()]
+DATE_PARSER = DateDataParser(languages=DATE_LANGUAGES, settings={"RETURN_TIME_AS_PERIOD": True})
+
+# Common unambiguous inputs, handled without the (much slower) general-purpose parser.
+_FAST_FORMATS = (
+    ("%Y-%m-%d", "day"),
+    ("%Y-%m-%dT%H:%M", "time"),
+    ("%Y-%m-%d %H:%M", "time"),
+)
+_FAST_DAYS = {
+    "yesterday": -1,
+    "today": 0,
+    "tomorrow": 1,
+}
 
 
 FILTERS: Dict[str, Func] = {
@@ -35,32 +55,85 @@ FILTERS: Dict[str, Func] = {
 }
 
 GLOBALS: Dict[str, Any] = {
-    "months": [date(2000, month, 1).strftime("%B") for month in range(1, 13)],
+    "months": tuple(date(2000, month, 1).strftime("%B") for month in range(1, 13)),
 }
 
 
+@lru_cache(maxsize=1)
+def _favicon(env: Environment, today: date) -> str:
+    # The icon only shows the day of the month, so it only needs rendering once a day.
+    icon = env.get_template("icon.j2").render({"now": today})
+    return "".join(line.strip() for line in icon.splitlines())
+
+
 def dynamic_globals(app: web.Application):
-    now = datetime.now()
-    tmpl = aiohttp_jinja2.get_env(app).get_template("icon.j2")
-    icon = tmpl.render({"now": now})
-    icon_line = "".join(line.strip() for line in icon.splitlines())
+    # Already in the display timezone, like the entries it's compared against.
+    now = datetime.now(TZ)
     return {
         "now": now,
-        "now_week": Week.thisweek(),
-        "favicon": icon_line,
+        "now_week": Week.withdate(now),
+        "favicon": _favicon(aiohttp_jinja2.get_env(app), now.date()),
     }
 
 
 def tzify(value: datetime):
-    return value.astimezone(TZ)
+    # Values are often converted more than once on their way through, which is a no-op.
+    return value if value.tzinfo is TZ else value.astimezone(TZ)
+
+
+@lru_cache(maxsize=4096)
+def _midnight(value: date) -> datetime:
+    # Views convert the same few days over and over, and the zone lookup isn't free.
+    return tzify(datetime(value.year, value.month, value.day))
+
+
+def _parse_known(text: str) -> Tuple[Optional[datetime], Optional[str]]:
+    key = text.strip().lower()
+    if key in _FAST_DAYS:
+        return datetime.now() + timedelta(days=_FAST_DAYS[key]), "day"
+    for fmt, period in _FAST_FORMATS:
+        try:
+            return datetime.strptime(key, fmt), period
+        except ValueError:
+            pass
+    try:
+        clock = datetime.strptime(key, "%H:%M")
+    except ValueError:
+        return None, None
+    else:
+        # Times alone fall on the current day.
+        return datetime.combine(date.today(), clock.time()), "time"
 
 
-def parse_date(text: str) -> Optional[DateMaybeTime]:
+_FUZZY_CACHE: Dict[Tuple[str, date], Tuple[Optional[datetime], Optional[str]]] = {}
+_FUZZY_CACHE_SIZE = 1024
+
+
+def _parse_fuzzy(text: str) -> Tuple[Optional[datetime], Optional[str]]:
+    # The current date is part of the key, so that words like "Friday" don't go stale.
+    key = (text, date.today())
+    try:
+        return _FUZZY_CACHE[key]
+    except KeyError:
+        pass
     parsed = DATE_PARSER.get_date_data(text)
-    value = parsed.date_obj
+    result = parsed.date_obj, parsed.period
+    # Relative phrases (e.g. "tomorrow", "in 2 hours") carry the current time of day, and may
+    # cross into another day as the clock moves on, so only keep results without a time.
+    if not result[0] or result[0].time() == time.min:
+        if len(_FUZZY_CACHE) >= _FUZZY_CACHE_SIZE:
+            _FUZZY_CACHE.clear()
+        _FUZZY_CACHE[key] = result
+    return result
+
+
+def parse_date(text: str) -> Optional[DateMaybeTime]:
+    value, period = _parse_known(text)
+    if not value:
+        value, period = _parse_fuzzy(text)
     if not value:
         return None
-    elif parsed.period == "time":
+    elif period == "time":
         return value
     else:
         return as_date(value)
@@ -75,7 +148,7 @@ def as_datetime(value: Optional[DateMaybeTime]) -> Optional[datetime]:
     if isinstance(value, datetime):
         return tzify(value)
     elif isinstance(value, date):
-        return tzify(datetime(value.year, value.month, value.day))
+        return _midnight(value)
     else:
         return value
 
@@ -101,7 +174,7 @@ def as_time(value: Optional[DateMaybeTime]) -> Optional[time]:
     if isinstance(value, datetime):
         return tzify(value).timetz()
     elif isinstance(value, date):
-        return tzify(datetime(value.year, value.month, value.day)).timetz()
+        return _midnight(value).timetz()
     else:
         return value
 
@@ -118,24 +191,34 @@ _PARSE_KEYWORDS = {
 }
 
 
-def text_parse(words: List[str]):
+# Keywords standing as whole words, and not escaped with a backslash.  Only ASCII case variants
+# match, as others (e.g. "İn", "ſtart") don't lowercase back to the keyword to look it up.
+_PARSE_KEYWORDS_RE = re.compile(r"(?<!\S)((?a:{}))(?!\S)".format("|".join(_PARSE_KEYWORDS)),
+                                re.IGNORECASE)
+
+
+def _parse_words(text: str):
+    return [word[1:] if word.startswith("\\") else word for word in text.split()]
+
+
+def text_parse(text: str):
     """
     Parse a written string describing details of an event.  Start and end timestamps (or a start
     and duration) and locations can be resolved.  Use a backslash to avoid parsing a keyword.
 
-        >>> text_parse(r"Theme park from tomorrow all day until Friday at Disneyland Paris".split())
+        >>> text_parse(r"Theme park from tomorrow all day until Friday at Disneyland Paris")
         ("Theme park", date(2021, 6, 2), date(2021, 6, 4), "Disneyland Paris")
     """
-    grouped = {}
+    grouped: Dict[str, List[str]] = {}
     for key in ("title", "start", "end", "delta", "location"):
         grouped[key] = []
+    # Splitting on a capturing group alternates text with the keywords found between it.
+    parts = _PARSE_KEYWORDS_RE.split(text)
     current = "title"
-    for word in words:
-        if word.startswith("\\"):
-            word = word[1:]
-            grouped[current].append(word)
-            continue
-        group = _PARSE_KEYWORDS.get(word.lower())
+    grouped[current].extend(_parse_words(parts[0]))
+    for pos in range(1, len(parts), 2):
+        keyword, following = parts[pos], parts[pos + 1]
+        group = _PARSE_KEYWORDS[keyword.lower()]
         if isinstance(group, tuple):
             for option in group:
                 if not grouped[option]:
@@ -146,7 +229,8 @@ def text_parse(words: List[str]):
         if group:
             current = group
         else:
-            grouped[current].append(word)
+            grouped[current].append(keyword)
+        grouped[current].extend(_parse_words(following))
     values = {key: " ".join(words) or None for key, words in grouped.items()}
     title = values["title"]
     location = values["location"]
@@ -173,9 +257,9 @@ def text_parse(words: List[str]):
 
 def repr_factory(parts: Callable[[T], Iterable[Optional[str]]]) -> Callable[[T], str]:
     def __repr__(self: T):
-        items = " ".join(filter(None, parts(self)))
-        inner = ": ".join(filter(None, (self.__class__.__name__, items)))
-        return "<{}>".format(inner)
+        items = " ".join(part for part in parts(self) if part)
+        name = self.__class__.__name__
+        return "<{}: {}>".format(name, items) if items else "<{}>".format(name)
     return __repr__
 
 
@@ -188,14 +272,34 @@ def add_global(fn: Func):
     return fn
 
 
+_TIMEDELTA_KEYS = frozenset(("weeks", "days", "hours", "minutes", "seconds", "milliseconds",
+                             "microseconds"))
+_TIMEDELTA_DATE_KEYS = frozenset(("weeks", "days"))
+
+
+@lru_cache(maxsize=128)
+def _relativedelta(items: Tuple[Tuple[str, Any], ...]) -> relativedelta:
+    # Templates only ever use a few offsets (e.g. next/previous month), so reuse them.
+    return relativedelta(**dict(items))
+
+
 @add_filter
 def delta(value: date, **kwargs):
-    return value + relativedelta(**kwargs)
+    # Plain timedeltas are much cheaper, only calendar-aware units need a relativedelta.  Dates
+    # only take whole days from a timedelta, whereas a relativedelta turns them into datetimes.
+    keys = _TIMEDELTA_KEYS if isinstance(value, datetime) else _TIMEDELTA_DATE_KEYS
+    if keys.issuperset(kwargs):
+        return value + timedelta(**kwargs)
+    else:
+        return value + _relativedelta(tuple(sorted(kwargs.items())))
+
+
+_DAY_PERCENT = 100 / (24 * 60 * 60)
 
 
 @add_filter
 def day_percent(value: Optional[time]):
     if value:
-        return 100 * ((value.hour + (value.minute + value.second / 60) / 60) / 24)
+        return (value.hour * 3600 + value.minute * 60 + value.second) * _DAY_PERCENT
     else:
         return None
@@ -1,26 +1,28 @@
 from datetime import date, datetime, timedelta
+from pathlib import Path
 import unittest
 
 from icalendar.prop import vDDDTypes
 
-from davendar.collection import Event
+from davendar.collection import Calendar, Collection, Event, Task
 
 
 class TestEntry(unittest.TestCase):
 
-    def setUp(self):
-        self.now = datetime.now().astimezone()
-        self.today = self.now.date()
-        self.today_end = datetime(self.today.year, self.today.month,
-                                  self.today.day, 17).astimezone()
-        self.yesterday = self.today - timedelta(1)
-        self.yesterday_start = datetime(self.yesterday.year, self.yesterday.month,
-                                        self.yesterday.day, 9).astimezone()
-        self.yesterday_end = datetime(self.yesterday.year, self.yesterday.month,
-                                      self.yesterday.day, 17).astimezone()
-        self.tomorrow = self.today + timedelta(1)
-        self.midnight = datetime(self.today.year, self.today.month,
-                                 self.today.day).astimezone().timetz()
+    @classmethod
+    def setUpClass(cls):
+        cls.now = datetime.now().astimezone()
+        cls.today = cls.now.date()
+        cls.today_end = datetime(cls.today.year, cls.today.month,
+                                 cls.today.day, 17).astimezone()
+        cls.yesterday = cls.today - timedelta(1)
+        cls.yesterday_start = datetime(cls.yesterday.year, cls.yesterday.month,
+                                       cls.yesterday.day, 9).astimezone()
+        cls.yesterday_end = datetime(cls.yesterday.year, cls.yesterday.month,
+                                     cls.yesterday.day, 17).astimezone()
+        cls.tomorrow = cls.today + timedelta(1)
+        cls.midnight = datetime(cls.today.year, cls.today.month,
+                                cls.today.day).astimezone().timetz()
 
     def _event(self, start: date, end: date):
         e = Event()
@@ -113,6 +115,130 @@ class TestEntry(unittest.TestCase):
         self.assertIsNone(e.times(self.today + timedelta(1)),
                           "Event leaks into future")
 
+    def test_recurrence(self):
+        # 12/03 09:00-17:00, daily
+        e = self._event(self.yesterday_start, self.yesterday_end)
+        e._core.add("RRULE", {"FREQ": "DAILY"})
+        recurring = e.recurrence(self.yesterday, self.tomorrow + timedelta(1))
+        self.assertEqual([recur.start_dt for recur in recurring],
+                         [self.yesterday_start + timedelta(offset) for offset in range(3)],
+                         "Recurrences not generated")
+
+    def test_recurrence_updated(self):
+        # 12/03 09:00-17:00, daily, renamed
+        e = self._event(self.yesterday_start, self.yesterday_end)
+        e._core.add("RRULE", {"FREQ": "DAILY"})
+        e.recurrence(self.yesterday, self.tomorrow)
+        e.summary = "Renamed"
+        recurring = e.recurrence(self.yesterday, self.tomorrow)
+        self.assertEqual([recur.summary for recur in recurring], ["Renamed"] * 2,
+                         "Cached recurrences not invalidated")
+
+    def test_start_dt_updated(self):
+        # 12/03 09:00-17:00, moved to 13/03
+        e = self._event(self.yesterday_start, self.yesterday_end)
+        self.assertEqual(e.start_dt, self.yesterday_start)
+        e.start = self.today_end
+        self.assertEqual(e.start_dt, self.today_end, "Cached start not invalidated")
+
+    def test_priority_3(self):
+        t = Task()
+        self.assertIsNone(t.priority_3)
+        t.priority_3 = Task.Priority.HIGH
+        self.assertEqual(t.priority_3, Task.Priority.HIGH)
+        self.assertEqual(t.to_ical().count(b"PRIORITY:6"), 1, "Priority not written")
+        t.priority_3 = None
+        self.assertIsNone(t.priority_3)
+        self.assertNotIn(b"PRIORITY", t.to_ical(), "Priority not removed")
+
+
+class TestCalendarIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.start = datetime(2021, 3, 12, 9).astimezone()
+        self.end = datetime(2021, 3, 12, 17).astimezone()
+
+    def _event(self, start: datetime, end: datetime, rrule: bool = False):
+        e = Event()
+        e._core["DTSTART"] = vDDDTypes(start)
+        e._core["DTEND"] = vDDDTypes(end)
+        if rrule:
+            e._core.add("RRULE", {"FREQ": "DAILY"})
+        return e
+
+    def test_candidates_fixed(self):
+        before = self._event(self.start - timedelta(2), self.end - timedelta(2))
+        during = self._event(self.start, self.end)
+        after = self._event(self.start + timedelta(2), self.end + timedelta(2))
+        index = Calendar.Index([before, during, after])
+        candidates = index.candidates(self.start, self.end)
+        self.assertNotIn(before, candidates, "Past entry included")
+        self.assertIn(during, candidates, "Current entry not included")
+        self.assertNotIn(after, candidates, "Future entry included")
+
+    def test_candidates_long(self):
+        # 12/02 09:00 -- 13/03 17:00
+        e = self._event(self.start - timedelta(28), self.end + timedelta(1))
+        short = self._event(self.start - timedelta(2), self.end - timedelta(2))
+        index = Calendar.Index([e, short])
+        self.assertIn(e, index.candidates(self.start, self.end), "Spanning entry not included")
+        self.assertNotIn(short, index.candidates(self.start, self.end), "Past entry included")
+
+    def test_candidates_recurring(self):
+        e = self._event(self.start - timedelta(28), self.end - timedelta(28), rrule=True)
+        index = Calendar.Index([e])
+        self.assertIn(e, index.candidates(self.start, self.end), "Recurring entry not included")
+        self.assertTrue(index.overlaps(self.start, self.end), "Recurring entry not overlapping")
+
+    def test_overlaps(self):
+        e = self._event(self.start - timedelta(2), self.end - timedelta(2))
+        index = Calendar.Index([e])
+        self.assertFalse(index.overlaps(self.start, self.end), "Past calendar overlapping")
+
+    def test_edited(self):
+        calendar = Calendar(Collection(Path("/nonexistent")), "test")
+        early = self._event(self.start, self.end)
+        early._core["UID"] = "early"
+        late = self._event(self.start + timedelta(1), self.end + timedelta(1))
+        late._core["UID"] = "late"
+        calendar.add_entry(early)
+        calendar.add_entry(late)
+        self.assertEqual(calendar.events, (early, late))
+        self.assertEqual(calendar.slice(self.start, self.end), [early])
+        # Move the first event after the second.
+        early.start = self.start + timedelta(2)
+        early.end = self.end + timedelta(2)
+        self.assertEqual(calendar.events, (late, early), "Sorted events not invalidated")
+        self.assertEqual(calendar.slice(self.start, self.end), [], "Index not invalidated")
+        self.assertEqual(calendar.slice(self.start + timedelta(2), self.end + timedelta(2)),
+                         [early], "Moved entry not found")
+
+    def test_tasks_excluded(self):
+        task = Task()
+        task._core["DTSTART"] = vDDDTypes(self.start)
+        task._core["DUE"] = vDDDTypes(self.end)
+        index = Calendar.Index([task])
+        self.assertEqual(index.slice(self.start, self.end), [], "Task included")
+
+    def test_undated(self):
+        index = Calendar.Index([Task()])
+        self.assertFalse(index.overlaps(self.start, self.end), "Undated calendar overlapping")
+        self.assertEqual(index.candidates(self.start, self.end), [], "Undated entry included")
+
+    def test_partition(self):
+        calendar = Calendar(Collection(Path("/nonexistent")), "test")
+        event = self._event(self.start, self.end)
+        event._core["UID"] = "event"
+        task = Task()
+        task._core["UID"] = "task"
+        calendar.add_entry(event)
+        self.assertEqual(calendar.events, (event,), "Event not listed")
+        calendar.add_entry(task)
+        self.assertEqual(calendar.tasks, (task,), "Task not listed")
+        calendar.drop_entry(event)
+        self.assertEqual(calendar.events, (), "Dropped event still listed")
+        self.assertEqual(calendar.tasks, (task,), "Task not kept")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,24 @@
+from datetime import date, timedelta
+import unittest
+
+from davendar.utils import text_parse
+
+
+class TestTextParse(unittest.TestCase):
+
+    def test_keywords(self):
+        title, start, _, location = text_parse("Party IN Paris from tomorrow to friday")
+        self.assertEqual(title, "Party")
+        self.assertEqual(start, date.today() + timedelta(1))
+        self.assertEqual(location, "Paris")
+
+    def test_keywords_non_ascii(self):
+        title, _, _, location = text_parse("Party İn Paris from tomorrow to friday")
+        self.assertEqual(title, "Party İn Paris", "Non-ASCII variant used as keyword")
+        self.assertIsNone(location)
+        with self.assertRaises(ValueError):
+            text_parse("Meeting ſtart tomorrow to friday")
+
+
+if __name__ == "__main__":
+    unittest.main()